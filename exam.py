@@ -1,43 +1,118 @@
 
 import hashlib
+import multiprocessing
+import pickle
+import struct
 import time
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
+
+# Prefixes d'octets nuls pre-calcules pour la verification de la difficulte
+ZEROS = [b"\x00" * i for i in range(33)]
+# Pour chaque difficulte (nombre de zeros hexa): (octets nuls, prefixe, demi-octet)
+TARGETS = [(d // 2, ZEROS[d // 2], d & 1) for d in range(65)]
+# Nombre de nonces testes entre deux verifications de l'arret
+NONCE_BATCH = 4096
+# Le nonce est encode sur 8 octets big-endian a la fin de l'en-tete
+NONCE = struct.Struct(">Q")
+
+def find_nonce(header: bytes, difficulty: int, start: int = 0, step: int = 1,
+               found=None) -> Optional[Tuple[int, bytes]]:
+    """Cherche un nonce valide parmi start, start + step, start + 2*step..."""
+    # Compare le digest brut: pas de conversion hexadecimale par tentative
+    k, zeros, odd = TARGETS[difficulty]
+    # L'en-tete ne change pas pendant le minage: on le hache une seule fois
+    # puis on repart de cet etat intermediaire pour chaque nonce
+    copy = hashlib.sha256(header).copy
+    pack = NONCE.pack
+    
+    # Parcourt les nonces par lots avec range() pour limiter le travail de
+    # l'interpreteur; entre deux lots, abandonne si un autre processus a trouve
+    batch = NONCE_BATCH * step
+    while found is None or not found.is_set():
+        for nonce in range(start, start + batch, step):
+            h = copy()
+            h.update(pack(nonce))
+            digest = h.digest()
+            if digest[:k] == zeros and (not odd or digest[k] < 0x10):
+                return nonce, digest
+        start += batch
+    return None
+
+def _scan_nonces(header: bytes, difficulty: int, start: int, step: int, found, result) -> None:
+    """Processus de minage: publie le premier nonce valide trouve"""
+    hit = find_nonce(header, difficulty, start, step, found)
+    if hit is not None:
+        with result.get_lock():
+            if not found.is_set():
+                result.value = hit[0]
+                found.set()
+
+def mine_parallel(header: bytes, difficulty: int, start: int, workers: int) -> int:
+    """Repartit l'espace des nonces entre plusieurs processus"""
+    found = multiprocessing.Event()
+    result = multiprocessing.Value("Q", 0)
+    processes = [
+        multiprocessing.Process(
+            target=_scan_nonces,
+            args=(header, difficulty, start + i, workers, found, result)
+        )
+        for i in range(workers)
+    ]
+    for p in processes:
+        p.start()
+    for p in processes:
+        p.join()
+    if not found.is_set() or any(p.exitcode != 0 for p in processes):
+        raise RuntimeError("Minage parallele echoue: aucun nonce valide trouve")
+    return result.value
 
 class Block:
-    def __init__(self, index: int, data: str, previous_hash: str, timestamp: float = None):
+    __slots__ = ("index", "data", "previous_hash", "timestamp", "nonce", "hash")
+    
+    def __init__(self, index: int, data: str, previous_hash: bytes, timestamp: Optional[int] = None):
         self.index = index
         self.data = data
         self.previous_hash = previous_hash
-        self.timestamp = timestamp or time.time()
+        # Horodatage a la seconde: en-tete plus court et de longueur fixe
+        self.timestamp = timestamp if timestamp is not None else int(time.time())
         self.nonce = 0
         self.hash = self.calculate_hash()
     
-    def calculate_hash(self) -> str:
-        """Calcule le hash du bloc"""
-        block_string = f"{self.index}{self.data}{self.previous_hash}{self.timestamp}{self.nonce}"
-        return hashlib.sha256(block_string.encode()).hexdigest()
+    def header_prefix(self) -> bytes:
+        """Retourne l'en-tete du bloc sans le nonce"""
+        return f"{self.index}{self.data}".encode() + self.previous_hash + f"{self.timestamp}".encode()
+    
+    def calculate_hash(self) -> bytes:
+        """Calcule le hash du bloc (digest binaire de 32 octets)"""
+        return hashlib.sha256(self.header_prefix() + NONCE.pack(self.nonce)).digest()
     
-    def mine_block(self, difficulty: int) -> None:
+    def mine_block(self, difficulty: int, workers: int = 1) -> None:
         """Mine le bloc avec la preuve de travail"""
-        target = "0" * difficulty
         start_time = time.time()
+        header = self.header_prefix()
         
-        while self.hash[:difficulty] != target:
-            self.nonce += 1
+        if workers > 1:
+            self.nonce = mine_parallel(header, difficulty, self.nonce, workers)
             self.hash = self.calculate_hash()
+        else:
+            self.nonce, digest = find_nonce(header, difficulty, self.nonce)
+            self.hash = digest
         
         end_time = time.time()
-        print(f"Bloc mine: {self.hash} en {end_time - start_time:.2f} secondes avec {self.nonce} tentatives")
+        print(f"Bloc mine: {self.hash.hex()} en {end_time - start_time:.2f} secondes (nonce {self.nonce})")
 
 class Blockchain:
-    def __init__(self, difficulty: int = 4):
+    __slots__ = ("chain", "difficulty", "workers", "merkle_root")
+    
+    def __init__(self, difficulty: int = 4, workers: int = 1):
         self.chain = [self.create_genesis_block()]
         self.difficulty = difficulty
+        self.workers = workers
         self.merkle_root = None
     
     def create_genesis_block(self) -> Block:
         """Cree le bloc genesis"""
-        return Block(0, "Genesis Block", "0")
+        return Block(0, "Genesis Block", ZEROS[32])
     
     def get_latest_block(self) -> Block:
         """Retourne le dernier bloc de la chaine"""
@@ -51,31 +126,30 @@ class Blockchain:
             data=data,
             previous_hash=previous_block.hash
         )
-        new_block.mine_block(self.difficulty)
+        new_block.mine_block(self.difficulty, self.workers)
         self.chain.append(new_block)
         self.update_merkle_root()
     
-    def compute_merkle_root(self) -> str:
+    def compute_merkle_root(self) -> bytes:
         """Calcule la racine de l'arbre de Merkle"""
         if not self.chain:
-            return ""
+            return b""
         
-        # Recupere tous les hash des blocs
+        # Recupere tous les hash des blocs (32 octets): chaque paire fait
+        # 64 octets a hacher
         hashes = [block.hash for block in self.chain]
         
-        # Si nombre impair, duplique le dernier hash
-        if len(hashes) % 2 == 1:
-            hashes.append(hashes[-1])
-        
-        # Construit l'arbre de Merkle
+        # Construit l'arbre de Merkle: chaque niveau est calcule d'un bloc
+        # en parcourant les paires (a, b) avec zip sur un meme iterateur
+        sha256 = hashlib.sha256
         while len(hashes) > 1:
-            next_level = []
-            for i in range(0, len(hashes), 2):
-                combined = hashes[i] + hashes[i + 1]
-                next_level.append(hashlib.sha256(combined.encode()).hexdigest())
-            hashes = next_level
+            # Si nombre impair, duplique le dernier hash (a chaque niveau)
+            if len(hashes) % 2 == 1:
+                hashes.append(hashes[-1])
+            pairs = iter(hashes)
+            hashes = [sha256(a + b).digest() for a, b in zip(pairs, pairs)]
         
-        return hashes[0] if hashes else ""
+        return hashes[0] if hashes else b""
     
     def display_merkle_tree(self) -> None:
         """Affiche visuellement l'arbre de Merkle"""
@@ -87,27 +161,27 @@ class Blockchain:
         hashes = [block.hash for block in self.chain]
         print(f"Feuilles de l'arbre (hash des blocs):")
         for i, h in enumerate(hashes):
-            print(f"  Bloc {i}: {h[:16]}...")
-        
-        # Si nombre impair, duplique le dernier hash
-        if len(hashes) % 2 == 1:
-            hashes.append(hashes[-1])
-            print(f"  Duplication du dernier hash: {hashes[-1][:16]}...")
+            print(f"  Bloc {i}: {h.hex()[:16]}...")
         
         level = 0
         # Construit l'arbre de Merkle niveau par niveau
         while len(hashes) > 1:
+            # Si nombre impair, duplique le dernier hash
+            if len(hashes) % 2 == 1:
+                hashes.append(hashes[-1])
+                print(f"  Duplication du dernier hash: {hashes[-1].hex()[:16]}...")
+            
             level += 1
             next_level = []
             print(f"\nNiveau {level}:")
             for i in range(0, len(hashes), 2):
                 combined = hashes[i] + hashes[i + 1]
-                parent_hash = hashlib.sha256(combined.encode()).hexdigest()
+                parent_hash = hashlib.sha256(combined).digest()
                 next_level.append(parent_hash)
-                print(f"  Parent {i//2}: {parent_hash[:16]}... (de {hashes[i][:8]}... + {hashes[i+1][:8]}...)")
+                print(f"  Parent {i//2}: {parent_hash.hex()[:16]}... (de {hashes[i].hex()[:8]}... + {hashes[i+1].hex()[:8]}...)")
             hashes = next_level
         
-        print(f"\nRacine de Merkle: {hashes[0]}")
+        print(f"\nRacine de Merkle: {hashes[0].hex()}")
     
     def update_merkle_root(self) -> None:
         """Met a jour la racine de Merkle"""
@@ -115,19 +189,23 @@ class Blockchain:
     
     def is_chain_valid(self) -> bool:
         """Verifie l'integrite de la chaine"""
-        for i in range(1, len(self.chain)):
-            current_block = self.chain[i]
-            previous_block = self.chain[i - 1]
+        chain = self.chain
+        previous_hash = chain[0].hash
+        for i in range(1, len(chain)):
+            current_block = chain[i]
+            current_hash = current_block.hash
             
-            # Verifie le hash du bloc actuel
-            if current_block.hash != current_block.calculate_hash():
-                print(f"Hash invalide pour le bloc {i}")
+            # Verifie d'abord le lien avec le bloc precedent: simple comparaison,
+            # sans recalcul de hash
+            if current_block.previous_hash != previous_hash:
+                print(f"Lien invalide entre les blocs {i-1} et {i}")
                 return False
             
-            # Verifie le lien avec le bloc precedent
-            if current_block.previous_hash != previous_block.hash:
-                print(f"Lien invalide entre les blocs {i-1} et {i}")
+            # Verifie le hash du bloc actuel
+            if current_hash != current_block.calculate_hash():
+                print(f"Hash invalide pour le bloc {i}")
                 return False
+            previous_hash = current_hash
         
         return True
     
@@ -151,23 +229,32 @@ class DecentralizedNetwork:
         if num_nodes % 2 == 0:
             num_nodes += 1  # Assure un nombre impair
         
-        self.nodes = []
         self.difficulty = difficulty
         
-        # Cree les noeuds avec la meme chaine initiale
-        for i in range(num_nodes):
-            node = Blockchain(difficulty)
-            self.nodes.append(node)
+        # Cree les noeuds avec la meme chaine initiale (le genesis n'est pas
+        # mine: le construire directement coute moins qu'une copie)
+        self.nodes = [Blockchain(difficulty) for _ in range(num_nodes)]
         
         print(f"Reseau decentralise cree avec {num_nodes} noeuds")
     
     def add_block_to_all(self, data: str) -> None:
-        """Ajoute un bloc a tous les noeuds"""
+        """Ajoute un bloc a tous les noeuds
+        
+        Le bloc n'est mine qu'une fois par couple (dernier bloc, hauteur)
+        distinct, puis copie sur les noeuds qui partagent ce meme couple.
+        """
+        mined = {}
         for i, node in enumerate(self.nodes):
-            node.add_block(data)
+            key = (node.get_latest_block().hash, len(node.chain))
+            if key in mined:
+                node.chain.append(pickle.loads(mined[key]))
+                node.update_merkle_root()
+            else:
+                node.add_block(data)
+                mined[key] = pickle.dumps(node.get_latest_block())
             print(f"Bloc ajoute au noeud {i}")
     
-    def simulate_51_percent_attack(self) -> None:
+    def simulate_51_percent_attack(self) -> List[bool]:
         """Simule une attaque a 51%"""
         majority_count = len(self.nodes) // 2 + 1
         print(f"\n=== Simulation d'attaque 51% ===")
@@ -178,18 +265,20 @@ class DecentralizedNetwork:
             self.nodes[i].corrupt_block(1, f"DONNEES_CORROMPUES_NOEUD_{i}")
             self.nodes[i].add_block(f"BLOC_MALVEILLANT_{i}")
         
-        self.check_network_consensus()
+        return self.check_network_consensus()
     
-    def check_network_consensus(self) -> None:
-        """Verifie le consensus du reseau"""
+    def check_network_consensus(self) -> List[bool]:
+        """Verifie le consensus du reseau et retourne la validite de chaque noeud"""
         print("\n=== Etat du reseau ===")
         valid_chains = 0
         invalid_chains = 0
+        validity = []
         
         for i, node in enumerate(self.nodes):
             is_valid = node.is_chain_valid()
+            validity.append(is_valid)
             status = "VALIDE" if is_valid else "CORROMPUE"
-            print(f"Noeud {i}: {status} - Longueur: {len(node.chain)} - Merkle: {node.merkle_root[:16]}...")
+            print(f"Noeud {i}: {status} - Longueur: {len(node.chain)} - Merkle: {node.merkle_root.hex()[:16]}...")
             
             if is_valid:
                 valid_chains += 1
@@ -202,16 +291,26 @@ class DecentralizedNetwork:
             print("ALERTE: La majorite du reseau est corrompue!")
         else:
             print("Le reseau maintient son integrite")
+        
+        return validity
     
-    def detect_corrupted_chains(self) -> None:
-        """Detecte automatiquement les chaines corrompues et les rejette"""
+    def detect_corrupted_chains(self, validity: Optional[List[bool]] = None) -> None:
+        """Detecte automatiquement les chaines corrompues et les rejette
+        
+        `validity` permet de reutiliser une verification deja faite si les
+        noeuds n'ont pas change depuis; les messages de diagnostic par bloc
+        ne sont alors pas reaffiches.
+        """
+        if validity is not None:
+            assert len(validity) == len(self.nodes), "validity doit couvrir tous les noeuds"
         print("\n=== Detection automatique de corruption ===")
         
         valid_nodes = []
         corrupted_indices = []
         
         for i, node in enumerate(self.nodes):
-            if node.is_chain_valid():
+            is_valid = validity[i] if validity is not None else node.is_chain_valid()
+            if is_valid:
                 valid_nodes.append((i, node))
                 print(f"Noeud {i}: VALIDE - Accepte par le reseau")
             else:
@@ -262,9 +361,9 @@ def run_comprehensive_tests():
     # Verification de la preuve de travail
     print("\n- Verification de la preuve de travail:")
     last_block = test_blockchain.get_latest_block()
-    print(f"Hash du bloc mine: {last_block.hash}")
+    print(f"Hash du bloc mine: {last_block.hash.hex()}")
     print(f"Nonce utilise: {last_block.nonce}")
-    print(f"Hash commence par {'0' * test_blockchain.difficulty}: {last_block.hash.startswith('0' * test_blockchain.difficulty)}")
+    print(f"Hash commence par {'0' * test_blockchain.difficulty}: {last_block.hash.hex().startswith('0' * test_blockchain.difficulty)}")
     print("La preuve de travail fonctionne correctement!\n")
 
     # Etape 3: Arbre de Merkle
@@ -272,12 +371,12 @@ def run_comprehensive_tests():
     print("Construction et affichage de l'arbre de Merkle:")
     blockchain.display_merkle_tree()
     
-    print(f"\nRacine Merkle avant corruption: {blockchain.merkle_root}")
+    print(f"\nRacine Merkle avant corruption: {blockchain.merkle_root.hex()}")
     
     # Corruption et comparaison
     blockchain.corrupt_block(1, "DONNEES CORROMPUES")
     blockchain.update_merkle_root()
-    print(f"Racine Merkle apres corruption: {blockchain.merkle_root}")
+    print(f"Racine Merkle apres corruption: {blockchain.merkle_root.hex()}")
     
     print("\nComparaison visuelle - Nouvel arbre apres corruption:")
     blockchain.display_merkle_tree()
@@ -292,7 +391,7 @@ def run_comprehensive_tests():
     
     # Etape 5: Attaque 51%
     print("\n=== Etape 5: Attaque 51% ===")
-    network.simulate_51_percent_attack()
+    attack_validity = network.simulate_51_percent_attack()
     
     # Etape 6: Detection de corruption (sans correction)
     print("\n=== Etape 6: Detection de corruption ===")
@@ -302,7 +401,7 @@ def run_comprehensive_tests():
     clean_network.simulate_single_cheater()
     
     print("\nTest 2: Detection avec attaque majoritaire")
-    network.detect_corrupted_chains()
+    network.detect_corrupted_chains(attack_validity)
     
     print("\nTous les tests sont termines")
 
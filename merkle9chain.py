@@ -1,58 +1,118 @@
 import hashlib
+import multiprocessing
+import os
+import pickle
+import struct
 import time
 
+ZEROS = [b"\x00" * i for i in range(33)]
+TARGETS = [(d // 2, ZEROS[d // 2], d & 1) for d in range(65)]
+NONCE_BATCH = 4096
+NONCE = struct.Struct(">Q")
+
+def meets_difficulty(digest, difficulty):
+    k, zeros, odd = TARGETS[difficulty]
+    return digest[:k] == zeros and (not odd or digest[k] < 0x10)
+
+def find_nonce(header, difficulty, start=0, step=1, found=None):
+    k, zeros, odd = TARGETS[difficulty]
+    copy = hashlib.sha256(header).copy
+    pack = NONCE.pack
+    batch = NONCE_BATCH * step
+    while found is None or not found.is_set():
+        for nonce in range(start, start + batch, step):
+            h = copy()
+            h.update(pack(nonce))
+            digest = h.digest()
+            if digest[:k] == zeros and (not odd or digest[k] < 0x10):
+                return nonce, digest
+        start += batch
+    return None
+
+def _scan_nonces(header, difficulty, start, step, found, result):
+    hit = find_nonce(header, difficulty, start, step, found)
+    if hit is not None:
+        with result.get_lock():
+            if not found.is_set():
+                result.value = hit[0]
+                found.set()
+
+def mine_parallel(header, difficulty, start, workers):
+    found = multiprocessing.Event()
+    result = multiprocessing.Value("Q", 0)
+    processes = [
+        multiprocessing.Process(target=_scan_nonces, args=(header, difficulty, start + i, workers, found, result))
+        for i in range(workers)
+    ]
+    for p in processes:
+        p.start()
+    for p in processes:
+        p.join()
+    if not found.is_set() or any(p.exitcode != 0 for p in processes):
+        raise RuntimeError("Minage parallèle échoué : aucun nonce valide trouvé")
+    return result.value
+
 class Block:
-    def __init__(self, index, data, previous_hash, difficulty=5):
+    __slots__ = ("index", "timestamp", "data", "previous_hash", "nonce", "hash")
+
+    def __init__(self, index, data, previous_hash, difficulty=5, workers=1, timestamp=None):
         self.index = index
-        self.timestamp = time.time()
+        self.timestamp = timestamp if timestamp is not None else int(time.time())
         self.data = data
         self.previous_hash = previous_hash
         self.nonce = 0
-        self.hash = self.mine_block(difficulty)
+        self.hash = self.mine_block(difficulty, workers)
+
+    def header_prefix(self):
+        return f"{self.index}{self.timestamp}{self.data}".encode() + self.previous_hash
 
     def calculate_hash(self):
-        content = f"{self.index}{self.timestamp}{self.data}{self.previous_hash}{self.nonce}"
-        return hashlib.sha256(content.encode()).hexdigest()
+        return hashlib.sha256(self.header_prefix() + NONCE.pack(self.nonce)).digest()
 
-    def mine_block(self, difficulty):
-        prefix = "0" * difficulty
-        while True:
-            hash_attempt = self.calculate_hash()
-            if hash_attempt.startswith(prefix):
-                return hash_attempt
-            self.nonce += 1
+    def mine_block(self, difficulty, workers=1):
+        header = self.header_prefix()
+        if workers > 1:
+            self.nonce = mine_parallel(header, difficulty, self.nonce, workers)
+            return self.calculate_hash()
+        self.nonce, digest = find_nonce(header, difficulty, self.nonce)
+        return digest
 
 class MerkleTree:
     @staticmethod
     def calculate_merkle_root(hashes):
         if not hashes:
             return None
-        while len(hashes) > 1:
-            if len(hashes) % 2 != 0:
-                hashes.append(hashes[-1])
-            new_level = []
-            for i in range(0, len(hashes), 2):
-                combined = hashes[i] + hashes[i + 1]
-                new_hash = hashlib.sha256(combined.encode()).hexdigest()
-                new_level.append(new_hash)
-            hashes = new_level
-        return hashes[0]
+        # Hash binaires de 32 octets: une paire = 64 octets à hacher
+        level = list(hashes)
+        sha256 = hashlib.sha256
+        while len(level) > 1:
+            if len(level) % 2 != 0:
+                level.append(level[-1])
+            pairs = iter(level)
+            level = [sha256(a + b).digest() for a, b in zip(pairs, pairs)]
+        return level[0]
 
 class Blockchain:
-    def __init__(self, difficulty=5):
+    __slots__ = ("difficulty", "workers", "timestamp", "chain", "merkle_root")
+
+    # Un timestamp fixé rend la chaîne reproductible, mais seulement avec
+    # workers=1: en parallèle, le nonce retenu dépend du premier processus qui trouve
+    def __init__(self, difficulty=5, workers=1, timestamp=None):
         self.difficulty = difficulty
+        self.workers = workers
+        self.timestamp = timestamp
         self.chain = [self.create_genesis_block()]
         self.merkle_root = None
 
     def create_genesis_block(self):
-        return Block(0, "Genesis Block", "0", self.difficulty)
+        return Block(0, "Genesis Block", ZEROS[32], self.difficulty, self.workers, self.timestamp)
 
     def get_latest_block(self):
         return self.chain[-1]
 
     def add_block(self, data):
         previous_hash = self.get_latest_block().hash
-        block = Block(len(self.chain), data, previous_hash, self.difficulty)
+        block = Block(len(self.chain), data, previous_hash, self.difficulty, self.workers, self.timestamp)
         self.chain.append(block)
 
     def compute_merkle_root(self):
@@ -61,21 +121,22 @@ class Blockchain:
         return self.merkle_root
 
     def is_chain_valid(self):
-        prefix = "0" * self.difficulty
         invalid_blocks = []
+        chain = self.chain
+        difficulty = self.difficulty
+        hashes = [b.hash for b in chain]
 
-        for i in range(1, len(self.chain)):
-            current = self.chain[i]
-            previous = self.chain[i - 1]
+        for i in range(1, len(chain)):
+            current = chain[i]
 
-            if current.hash != current.calculate_hash():
+            if hashes[i] != current.calculate_hash():
                 invalid_blocks.append((i, "Hash falsifié"))
-            if current.previous_hash != previous.hash:
+            if current.previous_hash != hashes[i - 1]:
                 invalid_blocks.append((i, "previous_hash incorrect"))
-            if not current.hash.startswith(prefix):
+            if not meets_difficulty(hashes[i], difficulty):
                 invalid_blocks.append((i, "Difficulté non respectée"))
 
-        recalculated_merkle = MerkleTree.calculate_merkle_root([b.hash for b in self.chain])
+        recalculated_merkle = MerkleTree.calculate_merkle_root(hashes)
         if recalculated_merkle != self.merkle_root:
             print(" Merkle Root invalide")
 
@@ -90,7 +151,14 @@ class Blockchain:
 
     def display(self):
         for b in self.chain:
-            print(f"Block #{b.index} | Hash: {b.hash[:10]}... | Data: {b.data}")
+            print(f"Block #{b.index} | Hash: {b.hash.hex()[:10]}... | Data: {b.data}")
+
+def build_chain(difficulty, workers=1, timestamp=None):
+    bc = Blockchain(difficulty=difficulty, workers=workers, timestamp=timestamp)
+    for i in range(1, 9):
+        bc.add_block(f"Donnée #{i}")
+    bc.compute_merkle_root()
+    return bc
 
 def falsify_block(blockchain, indices_to_falsify):
     for idx in indices_to_falsify:
@@ -103,14 +171,10 @@ def run_verification(name, chain):
     print("État :", " Intègre" if valid else " Compromise")
 
 if __name__ == "__main__":
-    # Création des 9 blockchains
-    blockchains = []
-    for _ in range(9):
-        bc = Blockchain(difficulty=5)
-        for i in range(1, 9):
-            bc.add_block(f"Donnée #{i}")
-        bc.compute_merkle_root()
-        blockchains.append(bc)
+    # Création des 9 blockchains: une seule chaîne minée (sur tous les
+    # cœurs), puis copiée pour les 9 instances
+    template = pickle.dumps(build_chain(5, workers=os.cpu_count() or 1))
+    blockchains = [pickle.loads(template) for _ in range(9)]
 
     # Affichage des 2 premières chaînes valides
     print("\n Chaîne 0 (intègre) :")